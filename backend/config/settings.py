@@ -92,6 +92,7 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL', '')
 
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
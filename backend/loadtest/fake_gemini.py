@@ -0,0 +1,265 @@
+import re
+import json
+import math
+import random
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, List, Dict, Any
+
+class LatencyDistribution:
+    """Parses specs such as ``fixed:0.5``, ``uniform:0.2,1.5``,
+    ``normal:0.8,0.2``, ``lognormal:0.8,0.5`` (median, sigma) or
+    ``exponential:0.8`` (mean). All values are in seconds."""
+
+    KINDS = ['fixed', 'uniform', 'normal', 'lognormal', 'exponential']
+
+    def __init__(self, spec: str):
+        kind, _, raw_params = spec.partition(':')
+        kind = kind.strip().lower()
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution '{kind}'. Supported: {', '.join(self.KINDS)}")
+
+        try:
+            params = [float(p) for p in raw_params.split(',') if p.strip()]
+        except ValueError:
+            raise ValueError(f"Invalid latency parameters: {raw_params}")
+
+        expected = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2, 'exponential': 1}[kind]
+        if len(params) != expected:
+            raise ValueError(f"Latency distribution '{kind}' expects {expected} parameter(s), got {len(params)}")
+        if any(p < 0 for p in params):
+            raise ValueError("Latency parameters must not be negative.")
+
+        self.spec = spec
+        self.kind = kind
+        self.params = params
+
+    def sample(self) -> float:
+        if self.kind == 'fixed':
+            value = self.params[0]
+        elif self.kind == 'uniform':
+            value = random.uniform(self.params[0], self.params[1])
+        elif self.kind == 'normal':
+            value = random.gauss(self.params[0], self.params[1])
+        elif self.kind == 'lognormal':
+            median, sigma = self.params
+            value = random.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        else:
+            value = random.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+
+        return max(value, 0.0)
+
+    def __str__(self) -> str:
+        return self.spec
+
+class _HTTPServer(ThreadingHTTPServer):
+    # LLMService opens a new connection per /api/process/ call, so the stdlib
+    # default backlog of 5 would drop connections under load and show up as
+    # backend errors.
+    request_queue_size = 1024
+    daemon_threads = True
+
+class FakeGeminiServer:
+    """Local stand-in for the Gemini ``generateContent`` endpoint.
+
+    Point ``LLMService`` at it by setting ``GEMINI_BASE_URL`` to ``url``.
+    ``latency``, ``failure_rate`` and ``malformed_rate`` may be changed while
+    the server is running."""
+
+    FAILURE_STATUSES = [429, 500, 503]
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: str = 'fixed:0',
+        failure_rate: float = 0.0,
+        malformed_rate: float = 0.0
+    ):
+        self.latency = LatencyDistribution(latency)
+        self.failure_rate = failure_rate
+        self.malformed_rate = malformed_rate
+
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'failures': 0, 'malformed': 0}
+
+        self._httpd = _HTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure(
+        self,
+        latency: Optional[str] = None,
+        failure_rate: Optional[float] = None,
+        malformed_rate: Optional[float] = None
+    ):
+        if latency is not None:
+            self.latency = LatencyDistribution(latency)
+        if failure_rate is not None:
+            self.failure_rate = failure_rate
+        if malformed_rate is not None:
+            self.malformed_rate = malformed_rate
+
+    def start(self) -> 'FakeGeminiServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                server._count('requests')
+
+                if ':generateContent' not in self.path:
+                    self._send_json(404, _error_body(404, f"Unsupported path: {self.path}"))
+                    return
+
+                time.sleep(server.latency.sample())
+
+                if random.random() < server.failure_rate:
+                    server._count('failures')
+                    status = random.choice(server.FAILURE_STATUSES)
+                    self._send_json(status, _error_body(status, "Injected failure from fake Gemini server."))
+                    return
+
+                try:
+                    prompt = _extract_prompt(json.loads(body or b'{}'))
+                except (json.JSONDecodeError, AttributeError, TypeError):
+                    self._send_json(400, _error_body(400, "Invalid JSON payload."))
+                    return
+
+                if random.random() < server.malformed_rate:
+                    server._count('malformed')
+                    text = "Sorry, I cannot help with that."
+                else:
+                    text = json.dumps(_build_answer(prompt))
+
+                self._send_json(200, {
+                    'candidates': [{
+                        'content': {'role': 'model', 'parts': [{'text': text}]},
+                        'finishReason': 'STOP',
+                        'index': 0,
+                    }],
+                    'usageMetadata': {
+                        'promptTokenCount': len(prompt.split()),
+                        'candidatesTokenCount': len(text.split()),
+                        'totalTokenCount': len(prompt.split()) + len(text.split()),
+                    },
+                })
+
+            def _send_json(self, status: int, payload: Dict[str, Any]):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def _error_body(status: int, message: str) -> Dict[str, Any]:
+    statuses = {
+        400: 'INVALID_ARGUMENT',
+        404: 'NOT_FOUND',
+        429: 'RESOURCE_EXHAUSTED',
+        500: 'INTERNAL',
+        503: 'UNAVAILABLE',
+    }
+    return {'error': {'code': status, 'message': message, 'status': statuses.get(status, 'UNKNOWN')}}
+
+def _extract_prompt(payload: Dict[str, Any]) -> str:
+    texts = []
+    for content in payload.get('contents', []):
+        for part in content.get('parts', []):
+            if 'text' in part:
+                texts.append(part['text'])
+    return "\n".join(texts)
+
+def _build_answer(prompt: str) -> Dict[str, str]:
+    # Mirror what the real model would do for the load-test instruction:
+    # pick the column named in the user input, falling back to the first one.
+    columns: List[str] = []
+    match = re.search(r'Available column names: ([^\n]*)', prompt)
+    if match:
+        columns = [c.strip() for c in match.group(1).split(',') if c.strip()]
+
+    user_input = ""
+    match = re.search(r'User input: "(.*?)"', prompt)
+    if match:
+        user_input = match.group(1).lower()
+
+    column_name = columns[0] if columns else "value"
+    for col in columns:
+        if col.lower() in user_input:
+            column_name = col
+            break
+
+    return {
+        'column_name': column_name,
+        'pattern_description': 'digits',
+        'replacement': '***',
+        'regex_pattern': '\\d+',
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Gemini API.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='fixed:0', help="e.g. fixed:0.5, uniform:0.2,1.5, lognormal:0.8,0.5")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of requests answered with 429/500/503")
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help="Fraction of requests answered with non-JSON text")
+    args = parser.parse_args()
+
+    for name in ['failure_rate', 'malformed_rate']:
+        if not 0.0 <= getattr(args, name) <= 1.0:
+            parser.error(f"--{name.replace('_', '-')} must be between 0 and 1")
+
+    try:
+        server = FakeGeminiServer(
+            host = args.host,
+            port = args.port,
+            latency = args.latency,
+            failure_rate = args.failure_rate,
+            malformed_rate = args.malformed_rate
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    except OSError as e:
+        parser.error(f"Cannot listen on {args.host}:{args.port}: {e}")
+    print(f"Fake Gemini server listening on {server.url} (latency={server.latency})")
+    print(f"Run the backend with GEMINI_BASE_URL={server.url} to use it.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,513 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+import requests
+
+from .fake_gemini import FakeGeminiServer, LatencyDistribution
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_INSTRUCTION = "replace all numbers in the phone column to '***'"
+
+def build_csv(rows: int) -> bytes:
+    lines = ["id,name,email,phone"]
+    for i in range(rows):
+        lines.append(f"{i},user{i},user{i}@example.com,555-{i % 1000:03d}-{i % 10000:04d}")
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+def free_port(host: str) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+def port_available(host: str, port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        # gunicorn binds with SO_REUSEADDR too, so sockets in TIME_WAIT do not
+        # count as taken; a live listener still makes bind() fail.
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind((host, port))
+        except OSError:
+            return False
+        return True
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile.
+    rank = max(int(-(-pct * len(sorted_values) // 100)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+class GunicornProcess:
+    def __init__(self, bind: str, workers: int, threads: int, timeout: int, env: Dict[str, str]):
+        self.bind = bind
+        self.workers = workers
+        self.threads = threads
+        self.timeout = timeout
+        self.env = env
+        self.proc = None
+
+    def start(self):
+        cmd = [
+            sys.executable, '-m', 'gunicorn', 'config.wsgi:application',
+            '--bind', self.bind,
+            '--workers', str(self.workers),
+            '--threads', str(self.threads),
+            '--timeout', str(self.timeout),
+            '--log-level', 'warning',
+        ]
+        self.proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=self.env)
+
+    def wait_ready(self, base_url: str, timeout: float = 30.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with code {self.proc.returncode}")
+            try:
+                requests.get(base_url + '/', timeout=1)
+            except requests.RequestException:
+                time.sleep(0.2)
+                continue
+            # A response alone could come from another server on the same
+            # port, so also require that our gunicorn has forked its workers.
+            if not sys.platform.startswith('linux') or self.worker_pids():
+                return
+            time.sleep(0.2)
+        raise RuntimeError(f"gunicorn did not become ready within {timeout:.0f}s")
+
+    def worker_pids(self) -> List[int]:
+        if self.proc is None:
+            return []
+        pids = []
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # The command name may contain spaces; fields after it are fixed.
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except (OSError, IndexError):
+                continue
+            if int(fields[1]) == self.proc.pid:
+                pids.append(int(entry))
+        return sorted(pids)
+
+    def stop(self):
+        if self.proc is None or self.proc.poll() is not None:
+            return
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+def rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, IndexError, ValueError):
+        return None
+
+class MemorySampler:
+    def __init__(self, gunicorn: GunicornProcess, interval: float):
+        self.gunicorn = gunicorn
+        self.interval = interval
+        self.samples: List[Dict[str, Any]] = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = None
+
+    def start(self, start_time: float):
+        self._start = start_time
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            workers = {}
+            for pid in self.gunicorn.worker_pids():
+                rss = rss_bytes(pid)
+                if rss is not None:
+                    workers[pid] = rss
+            self.samples.append({
+                't': round(time.monotonic() - self._start, 2),
+                'master_rss': rss_bytes(self.gunicorn.proc.pid),
+                'worker_rss': workers,
+            })
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+class LoadRunner:
+    def __init__(
+        self,
+        base_url: str,
+        concurrency: int,
+        duration: float,
+        csv_data: bytes,
+        instruction: str,
+        request_timeout: float
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.duration = duration
+        self.csv_data = csv_data
+        self.instruction = instruction
+        self.request_timeout = request_timeout
+
+        self.results: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._start = None
+
+    def run(self, start_time: float):
+        self._start = start_time
+        deadline = start_time + self.duration
+        threads = [
+            threading.Thread(target=self._worker, args=(deadline,), daemon=True)
+            for _ in range(self.concurrency)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def _record(self, endpoint: str, started: float, status: Optional[int], error: Optional[str]):
+        finished = time.monotonic()
+        with self._lock:
+            self.results.append({
+                'endpoint': endpoint,
+                't': finished - self._start,
+                'latency': finished - started,
+                'status': status,
+                'ok': status is not None and 200 <= status < 300,
+                'error': error,
+            })
+
+    def _call(self, session: requests.Session, endpoint: str, **kwargs) -> Optional[Dict[str, Any]]:
+        started = time.monotonic()
+        try:
+            resp = session.post(f"{self.base_url}/api/{endpoint}/", timeout=self.request_timeout, **kwargs)
+        except requests.RequestException as e:
+            self._record(endpoint, started, None, type(e).__name__)
+            return None
+
+        error = None
+        body = None
+        try:
+            body = resp.json()
+        except ValueError:
+            error = 'invalid JSON response'
+        if resp.status_code >= 300 and body:
+            error = body.get('message') or body.get('error')
+        self._record(endpoint, started, resp.status_code, error)
+        return body if resp.ok else None
+
+    def _worker(self, deadline: float):
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            uploaded = self._call(
+                session, 'upload',
+                files = {'file': ('loadtest.csv', self.csv_data, 'text/csv')}
+            )
+            if not uploaded or time.monotonic() >= deadline:
+                continue
+
+            self._call(
+                session, 'process',
+                json = {'data': uploaded['data'], 'natural_language_input': self.instruction}
+            )
+
+def classify_error(result: Dict[str, Any]) -> str:
+    message = str(result['error'] or '')
+    if result['status'] is None:
+        return 'no_response'
+    if 'Injected failure from fake Gemini server' in message or 'Failed to parse JSON from LLM response' in message:
+        return 'injected'
+    if message.startswith('LLM service error'):
+        # The backend could not complete the call to the fake server, e.g. a
+        # connection reset. These come from the test setup, not the LLM.
+        return 'llm_connection'
+    return 'backend'
+
+def summarize(results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    def stats(items: List[Dict[str, Any]], window: float) -> Dict[str, Any]:
+        latencies = sorted(r['latency'] for r in items)
+        errors = sum(1 for r in items if not r['ok'])
+        return {
+            'requests': len(items),
+            'errors': errors,
+            'error_rate': errors / len(items) if items else 0.0,
+            'throughput': len(items) / window if window > 0 else 0.0,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+        }
+
+    summary = {'elapsed': elapsed, 'overall': stats(results, elapsed)}
+    for endpoint in ['upload', 'process']:
+        summary[endpoint] = stats([r for r in results if r['endpoint'] == endpoint], elapsed)
+
+    status_counts: Dict[str, int] = {}
+    error_messages: Dict[str, int] = {}
+    error_causes = {'injected': 0, 'llm_connection': 0, 'no_response': 0, 'backend': 0}
+    for r in results:
+        key = str(r['status']) if r['status'] is not None else 'no response'
+        status_counts[key] = status_counts.get(key, 0) + 1
+        if not r['ok']:
+            error_causes[classify_error(r)] += 1
+        if not r['ok'] and r['error']:
+            message = str(r['error'])[:120]
+            error_messages[message] = error_messages.get(message, 0) + 1
+    summary['status_counts'] = status_counts
+    summary['error_causes'] = error_causes
+    summary['top_errors'] = sorted(error_messages.items(), key=lambda kv: -kv[1])[:5]
+    return summary
+
+def _window(results: List[Dict[str, Any]], samples: List[Dict[str, Any]], start: float, end: float) -> Dict[str, Any]:
+    items = [r for r in results if start <= r['t'] < end]
+    latencies = sorted(r['latency'] for r in items)
+    window_samples = [s for s in samples if start <= s['t'] < end]
+    worker_rss = [sum(s['worker_rss'].values()) for s in window_samples if s['worker_rss']]
+    max_worker = [max(s['worker_rss'].values()) for s in window_samples if s['worker_rss']]
+    return {
+        'start': start,
+        'end': end,
+        'requests': len(items),
+        'throughput': len(items) / (end - start) if end > start else 0.0,
+        'errors': sum(1 for r in items if not r['ok']),
+        'p95': percentile(latencies, 95),
+        'workers_rss_total': max(worker_rss) if worker_rss else None,
+        'worker_rss_max': max(max_worker) if max_worker else None,
+    }
+
+def timeline(
+    results: List[Dict[str, Any]],
+    samples: List[Dict[str, Any]],
+    duration: float,
+    elapsed: float,
+    bucket: float
+) -> Dict[str, Any]:
+    # Windows cover the load phase only. Requests that finish after the
+    # deadline are reported as a separate drain period, since dividing them
+    # by a short leftover window would inflate its throughput.
+    bounds = []
+    t = 0.0
+    while t < duration:
+        end = min(t + bucket, duration)
+        bounds.append([t, end])
+        t = end
+    if len(bounds) > 1 and bounds[-1][1] - bounds[-1][0] < bucket / 2:
+        bounds[-2][1] = bounds.pop()[1]
+
+    drain = None
+    if elapsed > duration:
+        drain = _window(results, samples, duration, elapsed)
+        drain['end'] = elapsed
+
+    return {
+        'windows': [_window(results, samples, start, end) for start, end in bounds],
+        'drain': drain,
+    }
+
+def _mb(value: Optional[int]) -> str:
+    return f"{value / (1024 * 1024):.1f}" if value is not None else "-"
+
+def print_report(
+    summary: Dict[str, Any],
+    rows: Dict[str, Any],
+    fake: FakeGeminiServer,
+    memory_note: Optional[str] = None
+):
+    print()
+    print(f"Elapsed: {summary['elapsed']:.1f}s")
+    print(f"{'endpoint':<10}{'requests':>10}{'req/s':>10}{'errors':>8}{'err%':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name in ['upload', 'process', 'overall']:
+        s = summary[name]
+        print(
+            f"{name:<10}{s['requests']:>10}{s['throughput']:>10.2f}{s['errors']:>8}{s['error_rate'] * 100:>7.1f}%"
+            f"{s['p50'] * 1000:>10.0f}{s['p95'] * 1000:>10.0f}{s['p99'] * 1000:>10.0f}"
+        )
+
+    print()
+    print("Status codes: " + ", ".join(f"{k}={v}" for k, v in sorted(summary['status_counts'].items())))
+    causes = summary['error_causes']
+    print(
+        f"Error causes: injected by fake Gemini={causes['injected']}, LLM connection={causes['llm_connection']}, "
+        f"no response from backend={causes['no_response']}, other backend={causes['backend']}"
+    )
+    if causes['llm_connection']:
+        print(f"  Warning: {causes['llm_connection']} request(s) failed to reach the fake Gemini server. "
+              f"These are not injected failures.")
+    for message, count in summary['top_errors']:
+        print(f"  {count:>6} x {message}")
+    print(f"Fake Gemini: {fake.stats['requests']} requests, {fake.stats['failures']} injected failures, "
+          f"{fake.stats['malformed']} malformed responses")
+
+    print()
+    print(f"{'window':<14}{'req/s':>8}{'errors':>8}{'p95 ms':>10}{'workers MB':>12}{'max worker MB':>15}")
+    for row in rows['windows']:
+        window = f"{row['start']:.1f}-{row['end']:.1f}s"
+        print(
+            f"{window:<14}{row['throughput']:>8.2f}{row['errors']:>8}{row['p95'] * 1000:>10.0f}"
+            f"{_mb(row['workers_rss_total']):>12}{_mb(row['worker_rss_max']):>15}"
+        )
+    drain = rows['drain']
+    if drain:
+        print(
+            f"Drain {drain['start']:.1f}-{drain['end']:.1f}s: {drain['requests']} in-flight request(s) finished "
+            f"after the deadline, {drain['errors']} error(s), p95 {drain['p95'] * 1000:.0f} ms"
+        )
+    if memory_note:
+        print(memory_note)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description = "Drive /api/upload/ -> /api/process/ against a gunicorn-served backend "
+                      "backed by a local fake Gemini server."
+    )
+    parser.add_argument('--concurrency', type=int, default=8, help="Number of concurrent clients")
+    parser.add_argument('--duration', type=float, default=30.0, help="Test duration in seconds")
+    parser.add_argument('--rows', type=int, default=200, help="Rows in the generated CSV upload")
+    parser.add_argument('--instruction', default=DEFAULT_INSTRUCTION)
+    parser.add_argument('--request-timeout', type=float, default=60.0)
+
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn --workers")
+    parser.add_argument('--threads', type=int, default=1, help="gunicorn --threads")
+    parser.add_argument('--worker-timeout', type=int, default=30, help="gunicorn --timeout")
+    parser.add_argument('--bind', help="gunicorn --bind as HOST:PORT (default: a free port on 127.0.0.1)")
+    parser.add_argument('--target', help="Use an already running backend at this URL instead of starting gunicorn "
+                                         "(it must be started with GEMINI_BASE_URL pointing at the fake server)")
+
+    parser.add_argument('--fake-port', type=int, default=0, help="Port for the fake Gemini server (0 = random)")
+    parser.add_argument('--latency', default='lognormal:0.8,0.4',
+                        help="Fake Gemini latency: fixed:S, uniform:LO,HI, normal:MEAN,SD, lognormal:MEDIAN,SIGMA, exponential:MEAN")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of LLM calls failing with 429/500/503")
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help="Fraction of LLM calls returning non-JSON text")
+    parser.add_argument('--slow-after', type=float, help="Seconds into the run after which --slow-latency applies")
+    parser.add_argument('--slow-latency', help="Fake Gemini latency to switch to at --slow-after")
+
+    parser.add_argument('--sample-interval', type=float, default=1.0, help="Worker memory sampling interval in seconds")
+    parser.add_argument('--bucket', type=float, default=5.0, help="Timeline window size in seconds")
+    parser.add_argument('--json', dest='json_path', help="Write raw results and summary to this file")
+    args = parser.parse_args(argv)
+
+    if (args.slow_after is None) != (args.slow_latency is None):
+        parser.error("--slow-after and --slow-latency must be given together")
+    for name in ['failure_rate', 'malformed_rate']:
+        if not 0.0 <= getattr(args, name) <= 1.0:
+            parser.error(f"--{name.replace('_', '-')} must be between 0 and 1")
+    if args.bucket <= 0:
+        parser.error("--bucket must be greater than 0")
+    if args.sample_interval <= 0:
+        parser.error("--sample-interval must be greater than 0")
+    if not args.target:
+        if args.bind:
+            host, _, port = args.bind.rpartition(':')
+            if not host or not port.isdigit():
+                parser.error("--bind must be HOST:PORT")
+            if not port_available(host, int(port)):
+                parser.error(f"{args.bind} is already in use; pick another --bind or omit it to use a free port")
+        else:
+            args.bind = f"127.0.0.1:{free_port('127.0.0.1')}"
+    try:
+        if args.slow_latency:
+            LatencyDistribution(args.slow_latency)
+        fake = FakeGeminiServer(
+            port = args.fake_port,
+            latency = args.latency,
+            failure_rate = args.failure_rate,
+            malformed_rate = args.malformed_rate
+        ).start()
+    except ValueError as e:
+        parser.error(str(e))
+    except OSError as e:
+        parser.error(f"Cannot start fake Gemini server on port {args.fake_port}: {e}")
+
+    gunicorn = None
+    sampler = None
+    memory_note = None
+    slow_timer = None
+    try:
+        if args.target:
+            base_url = args.target
+            print(f"Fake Gemini server at {fake.url}; target {base_url} must use GEMINI_BASE_URL={fake.url}")
+        else:
+            env = dict(os.environ)
+            env.update({
+                'GEMINI_API_KEY': 'loadtest-fake-key',
+                'GEMINI_BASE_URL': fake.url,
+                'DJANGO_DEBUG': 'False',
+            })
+            gunicorn = GunicornProcess(args.bind, args.workers, args.threads, args.worker_timeout, env)
+            base_url = f"http://{args.bind}"
+            print(f"Starting gunicorn on {base_url} with {args.workers} worker(s) x {args.threads} thread(s); "
+                  f"fake Gemini at {fake.url}")
+            gunicorn.start()
+            gunicorn.wait_ready(base_url)
+
+        runner = LoadRunner(
+            base_url = base_url,
+            concurrency = args.concurrency,
+            duration = args.duration,
+            csv_data = build_csv(args.rows),
+            instruction = args.instruction,
+            request_timeout = args.request_timeout
+        )
+
+        print(f"Running {args.concurrency} client(s) for {args.duration:.0f}s (LLM latency {fake.latency}, "
+              f"failure rate {args.failure_rate:.0%})")
+        start = time.monotonic()
+        if gunicorn and sys.platform.startswith('linux'):
+            sampler = MemorySampler(gunicorn, args.sample_interval)
+            sampler.start(start)
+        elif gunicorn:
+            memory_note = "Worker memory is not reported: sampling reads /proc and only works on Linux."
+        else:
+            memory_note = ("Worker memory is not reported: with --target the backend processes are not "
+                           "started by the load test, so they cannot be sampled.")
+        if args.slow_after is not None:
+            slow_timer = threading.Timer(args.slow_after, fake.configure, kwargs={'latency': args.slow_latency})
+            slow_timer.daemon = True
+            slow_timer.start()
+
+        runner.run(start)
+        elapsed = time.monotonic() - start
+    finally:
+        if slow_timer:
+            slow_timer.cancel()
+        if sampler:
+            sampler.stop()
+        if gunicorn:
+            gunicorn.stop()
+        fake.stop()
+
+    samples = sampler.samples if sampler else []
+    summary = summarize(runner.results, elapsed)
+    rows = timeline(runner.results, samples, args.duration, elapsed, args.bucket)
+    print_report(summary, rows, fake, memory_note)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({
+                'config': vars(args),
+                'summary': summary,
+                'timeline': rows,
+                'memory_samples': samples,
+                'memory_note': memory_note,
+                'results': runner.results,
+            }, f, indent=2)
+        print(f"\nWrote results to {args.json_path}")
+
+    return 0 if summary['overall']['requests'] else 1
@@ -11,7 +11,12 @@ class LLMService:
         if not api_key:
             raise ValueError("GEMINI_API_KEY is not set in settings.")
         
-        self.client = genai.Client(api_key=api_key)
+        # GEMINI_BASE_URL points the client at a different endpoint, e.g. the
+        # local stand-in in loadtest/fake_gemini.py.
+        base_url = getattr(settings, "GEMINI_BASE_URL", None)
+        http_options = {'base_url': base_url} if base_url else None
+
+        self.client = genai.Client(api_key=api_key, http_options=http_options)
 
         self.model = getattr(settings, "GEMINI_MODEL_NAME", "gemini-3-flash-preview")
 